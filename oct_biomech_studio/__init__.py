@@ -3,6 +3,7 @@ from .models import (
     VolumeMeta,
     Volume,
     VolumePair,
+    AffineTransform,
     Segmentation,
     DVCParameters,
     DisplacementField,
@@ -11,7 +12,20 @@ from .models import (
 )
 from .roi import ROI, BoxROI, SphereROI
 from .dvc import DVCAlgorithm, FFTBasedDVC, NewtonRaphsonDVC
-from .io import load_volume, load_segmentation, load_volume_pair
+from .incremental import IncrementalDVC, SubsetResultStore
+from .io import (
+    load_volume,
+    load_segmentation,
+    load_volume_pair,
+    read_volume_meta,
+    StudyPrefetcher,
+)
+from .registration import (
+    estimate_transform,
+    register_volume_pair,
+    resample_volume,
+    transform_points,
+)
 
 __all__ = [
     "Label",
@@ -19,6 +33,7 @@ __all__ = [
     "VolumeMeta",
     "Volume",
     "VolumePair",
+    "AffineTransform",
     "Segmentation",
     "DVCParameters",
     "DisplacementField",
@@ -30,7 +45,15 @@ __all__ = [
     "DVCAlgorithm",
     "FFTBasedDVC",
     "NewtonRaphsonDVC",
+    "IncrementalDVC",
+    "SubsetResultStore",
     "load_volume",
     "load_segmentation",
     "load_volume_pair",
+    "read_volume_meta",
+    "StudyPrefetcher",
+    "estimate_transform",
+    "register_volume_pair",
+    "resample_volume",
+    "transform_points",
 ]
@@ -10,7 +10,7 @@ from PySide6.QtWidgets import (
     QVBoxLayout,
     QWidget,
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer
 from PySide6.QtGui import  QAction
 
 class MainWindow(QMainWindow):
@@ -68,6 +68,21 @@ class MainWindow(QMainWindow):
         self.roi_interactor = None
         self.btn_roi_box.clicked.connect(self._enable_box_roi)
         self.btn_roi_sphere.clicked.connect(self._enable_sphere_roi)
+        self.btn_compute.clicked.connect(self._compute_dvc)
+
+        # DVC runs in a separate compute process; events are pumped from a timer.
+        self.dvc_params = None
+        self.compute_client = None
+        self.compute_timer = QTimer(self)
+        self.compute_timer.setInterval(100)
+        self.compute_timer.timeout.connect(self._poll_compute)
+
+        # ROI widgets fire on every drag event; recompute once the ROI settles.
+        self.live_dvc = None
+        self.roi_timer = QTimer(self)
+        self.roi_timer.setSingleShot(True)
+        self.roi_timer.setInterval(150)
+        self.roi_timer.timeout.connect(self._update_live_roi)
 
         # Right 3D view
         try:
@@ -126,6 +141,7 @@ class MainWindow(QMainWindow):
             from .io import load_volume_pair
 
             self.volume_pair = load_volume_pair(ref_path, def_path)
+            self.live_dvc = None
             QMessageBox.information(
                 self, "Loaded", f"Pair loaded: {ref_path} & {def_path}"
             )
@@ -164,11 +180,46 @@ class MainWindow(QMainWindow):
         try:
             from .surface import build_surface_meshs, add_surface_actors
 
-            self.surface_meshes = build_surface_meshs(self.segmentation, smoothing=1)
+            self.surface_meshes = build_surface_meshs(
+                self.segmentation, smoothing=1, max_triangles=100_000
+            )
+            self.surface_probes = {}
+            self.surface_scalars = None
             self.surface_actors = add_surface_actors(self.plotter, self.surface_meshes)
+            if hasattr(self, "dvc_result"):
+                self._update_surface_scalars(self.dvc_result)
         except Exception as e:
             QMessageBox.critical(self, "Error", str(e))
 
+    def _update_surface_scalars(self, result, field: str = "ezz"):
+        if not getattr(self, "surface_meshes", None):
+            return
+        try:
+            from .surface import (
+                add_surface_actors,
+                scalar_range,
+                set_surface_range,
+                update_surface_scalars,
+            )
+
+            self.surface_probes = update_surface_scalars(
+                self.surface_meshes, result, field, self.surface_probes
+            )
+            if self.surface_scalars != field:
+                # Actors are switched to scalar colouring once; later results update in place.
+                self.surface_actors = add_surface_actors(
+                    self.plotter, self.surface_meshes, scalars=field
+                )
+                self.surface_scalars = field
+            else:
+                set_surface_range(
+                    self.surface_actors, scalar_range(self.surface_meshes, field)
+                )
+            self.plotter.render()
+        except Exception as e:
+            # Runs on every debounced ROI update, so never open a modal dialog here.
+            self.statusBar().showMessage(f"Surface update failed: {e}")
+
     def _toggle_layer(self, state):
         sender = self.sender()
         label_name = sender.text()
@@ -201,7 +252,118 @@ class MainWindow(QMainWindow):
 
     def _roi_created(self, roi):
         self.current_roi = roi
-        QMessageBox.information(self, "ROI", f"ROI created: {roi}")
+        self.statusBar().showMessage(f"ROI: {roi}")
+        self.roi_timer.start()
+
+    def _ensure_compute(self):
+        from .compute import ComputeClient
+        from .models import DVCParameters
+
+        if self.compute_client is not None and not self.compute_client.alive():
+            # The worker died (e.g. OOM); poll() has already failed its jobs.
+            self.compute_client.shutdown()
+            self.compute_client = None
+        if self.compute_client is None:
+            self.compute_client = ComputeClient()
+        if self.dvc_params is None:
+            self.dvc_params = DVCParameters(
+                subset_size=(32, 32, 32), step_size=(8, 8, 8), algorithm="fft"
+            )
+        return self.compute_client
+
+    def _update_live_roi(self):
+        if not hasattr(self, "volume_pair") or not hasattr(self, "current_roi"):
+            return
+        try:
+            client = self._ensure_compute()
+            if self.live_dvc is None:
+                from .dvc import FFTBasedDVC
+                from .incremental import IncrementalDVC
+
+                self.live_dvc = IncrementalDVC(
+                    self.volume_pair, self.dvc_params, FFTBasedDVC()
+                )
+            live = self.live_dvc
+            batches = live.plan(self.current_roi)
+            if not batches:
+                self._show_live_result(live)
+                return
+            for batch in batches:
+                client.submit_dvc(
+                    batch.pair,
+                    self.current_roi,
+                    self.dvc_params,
+                    on_done=lambda handle, batch=batch: self._live_batch_done(
+                        live, batch, handle
+                    ),
+                )
+            self.compute_timer.start()
+        except Exception as e:
+            QMessageBox.critical(self, "Error", str(e))
+
+    def _live_batch_done(self, live, batch, handle):
+        if handle.error is not None:
+            live.discard(batch)
+            self.statusBar().showMessage(f"ROI update failed: {handle.error}")
+            return
+        live.integrate(batch, handle.result)
+        if live is self.live_dvc:
+            self._show_live_result(live)
+
+    def _show_live_result(self, live):
+        import numpy as np
+
+        self.dvc_result = live.result()
+        self._update_surface_scalars(self.dvc_result)
+        ezz = self.dvc_result.strain.ezz
+        count = int(np.count_nonzero(~np.isnan(ezz)))
+        mean = float(np.nanmean(ezz)) if count else float("nan")
+        self.statusBar().showMessage(
+            f"ROI: {count}/{len(live.active)} subsets, mean ezz {mean:.4g}"
+        )
+
+    def _compute_dvc(self):
+        if not hasattr(self, "volume_pair") or not hasattr(self, "current_roi"):
+            QMessageBox.warning(self, "DVC", "Load a volume pair and draw an ROI first")
+            return
+        try:
+            client = self._ensure_compute()
+            client.submit_dvc(
+                self.volume_pair,
+                self.current_roi,
+                self.dvc_params,
+                on_progress=self._dvc_progress,
+                on_done=self._dvc_done,
+            )
+            self.btn_compute.setEnabled(False)
+            self.statusBar().showMessage("DVC running...")
+            self.compute_timer.start()
+        except Exception as e:
+            QMessageBox.critical(self, "Error", str(e))
+
+    def _poll_compute(self):
+        if self.compute_client is not None:
+            self.compute_client.poll()
+            if not self.compute_client.pending():
+                self.compute_timer.stop()
+
+    def _dvc_progress(self, handle):
+        self.statusBar().showMessage(f"DVC running... {handle.progress:.0%}")
+
+    def _dvc_done(self, handle):
+        self.btn_compute.setEnabled(True)
+        if handle.error is not None:
+            self.statusBar().clearMessage()
+            QMessageBox.critical(self, "Error", handle.error)
+            return
+        self.dvc_result = handle.result
+        self._update_surface_scalars(self.dvc_result)
+        self.statusBar().showMessage("DVC finished", 5000)
+
+    def closeEvent(self, event):
+        if self.compute_client is not None:
+            self.compute_client.shutdown()
+        super().closeEvent(event)
 
 
 def launch():
@@ -0,0 +1,421 @@
+import glob
+import itertools
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import weakref
+import multiprocessing as mp
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+import numpy as np
+from .models import (
+    AffineTransform,
+    DisplacementField,
+    DVCParameters,
+    DVCResult,
+    Segmentation,
+    StrainTensor,
+    Volume,
+    VolumeMeta,
+    VolumePair,
+)
+from .roi import ROI
+
+
+_DISPLACEMENT_FIELDS = ("u", "v", "w")
+_STRAIN_FIELDS = ("exx", "eyy", "ezz", "exy", "eyz", "ezx")
+
+
+def _write_array(arr, path: str) -> str:
+    out = np.lib.format.open_memmap(path, mode="w+", dtype=arr.dtype, shape=arr.shape)
+    out[...] = arr
+    out.flush()
+    del out
+    return path
+
+
+def _open_array(path: str):
+    return np.load(path, mmap_mode="r")
+
+
+def _npy_backing(arr) -> Optional[str]:
+    # Path of the .npy file arr maps in full, so the worker can open it directly.
+    filename = getattr(arr, "filename", None)
+    if not isinstance(arr, np.memmap) or not filename or not str(filename).endswith(".npy"):
+        return None
+    try:
+        disk = _open_array(str(filename))
+    except Exception:
+        return None
+    if (
+        disk.shape == arr.shape
+        and disk.dtype == arr.dtype
+        and disk.strides == arr.strides
+        and disk.offset == arr.offset
+    ):
+        return str(filename)
+    return None
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _slab_bounds(n: int, step: int, max_slabs: int = 16):
+    # Slabs along axis 0, whole multiples of the subset step, at most max_slabs of them.
+    step = max(1, int(step))
+    thickness = max(step, -(-n // max_slabs))
+    thickness = -(-thickness // step) * step
+    return [(x, min(n, x + thickness)) for x in range(0, n, thickness)]
+
+
+def _run_dvc(job: Dict[str, Any], workdir: str, emit: Callable) -> Dict[str, Any]:
+    from .dvc import FFTBasedDVC, NewtonRaphsonDVC
+    from .incremental import crop_transform, crop_volume
+
+    params: DVCParameters = job["params"]
+    algorithm = {"fft": FFTBasedDVC, "newton": NewtonRaphsonDVC}[params.algorithm]()
+    reference = Volume(data=_open_array(job["reference"]), meta=job["reference_meta"])
+    deformed = Volume(data=_open_array(job["deformed"]), meta=job["deformed_meta"])
+    shape = tuple(reference.data.shape)
+    paths = {
+        name: os.path.join(workdir, f"{job['id']}_{name}.npy")
+        for name in _DISPLACEMENT_FIELDS + _STRAIN_FIELDS
+    }
+    outputs = {
+        name: np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=shape)
+        for name, path in paths.items()
+    }
+    # The engine runs slab by slab along axis 0. Each slab crop carries a half-subset
+    # halo so its subsets stay whole. Finished rows are written straight into the
+    # shared outputs and announced, so clients can render them before the job ends.
+    halo = params.subset_size[0] // 2
+    slabs = _slab_bounds(shape[0], params.step_size[0])
+    for i, (x0, x1) in enumerate(slabs, start=1):
+        c0 = max(0, x0 - halo)
+        c1 = min(shape[0], x1 + halo)
+        lo = (c0, 0, 0)
+        hi = (c1, shape[1], shape[2])
+        result = algorithm.compute(
+            crop_volume(reference, lo, hi),
+            crop_volume(deformed, lo, hi),
+            job["roi"],
+            params,
+            initial_guess=crop_transform(job.get("initial_guess"), lo),
+        )
+        for name, out in outputs.items():
+            source = result.displacement if name in _DISPLACEMENT_FIELDS else result.strain
+            out[x0:x1] = getattr(source, name)[x0 - c0 : x1 - c0]
+            out.flush()
+        emit("progress", i / len(slabs))
+        emit("partial", {"paths": paths, "filled": x1})
+    del outputs
+    return {"paths": paths, "meta": reference.meta}
+
+
+def _run_surface(job: Dict[str, Any], workdir: str, emit: Callable) -> Dict[str, Any]:
+    from .surface import build_surface_meshs
+
+    segmentation = Segmentation(labels=_open_array(job["labels"]), meta=job["meta"])
+    meshes = build_surface_meshs(segmentation, smoothing=job["smoothing"])
+    out: Dict[int, Optional[Tuple[str, str]]] = {}
+    for i, (label, mesh) in enumerate(meshes.items(), start=1):
+        if mesh is None:
+            out[int(label)] = None
+        else:
+            prefix = os.path.join(workdir, f"{job['id']}_{label.name}")
+            out[int(label)] = (
+                _write_array(np.asarray(mesh.points), prefix + "_points.npy"),
+                _write_array(np.asarray(mesh.faces), prefix + "_faces.npy"),
+            )
+        emit("progress", i / len(meshes))
+    return {"meshes": out}
+
+
+_RUNNERS = {"dvc": _run_dvc, "surface": _run_surface}
+
+
+def _serve(jobs, events, workdir: str) -> None:
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+        job_id = job["id"]
+
+        def emit(kind, payload, job_id=job_id):
+            events.put((job_id, kind, payload))
+
+        try:
+            emit("done", _RUNNERS[job["kind"]](job, workdir, emit))
+        except Exception as e:
+            emit("error", f"{type(e).__name__}: {e}")
+
+
+@dataclass
+class JobHandle:
+    id: int
+    kind: str
+    progress: float = 0.0
+    result: Any = None
+    error: Optional[str] = None
+    # Streamed result arrays; rows [0, filled) along axis 0 are already final.
+    partials: Dict[str, Any] = field(default_factory=dict)
+    filled: int = 0
+    on_progress: Optional[Callable[["JobHandle"], None]] = None
+    on_done: Optional[Callable[["JobHandle"], None]] = None
+    _done: threading.Event = field(default_factory=threading.Event, repr=False)
+    # Source arrays stay referenced until the job ends so their memmaps are not pruned.
+    _inputs: Tuple[Any, ...] = field(default=(), repr=False)
+    _arrays: Dict[str, Any] = field(default_factory=dict, repr=False)
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+
+class ComputeClient:
+    def __init__(self, workdir: Optional[str] = None):
+        self._owns_workdir = workdir is None
+        self.workdir = workdir or tempfile.mkdtemp(prefix="oct_compute_")
+        # spawn keeps the worker free of the parent's Qt/VTK state.
+        ctx = mp.get_context("spawn")
+        self._jobs = ctx.Queue()
+        self._events = ctx.Queue()
+        self._process = ctx.Process(
+            target=_serve, args=(self._jobs, self._events, self.workdir), daemon=True
+        )
+        self._process.start()
+        self._ids = itertools.count(1)
+        self._names = itertools.count(1)
+        self._handles: Dict[int, JobHandle] = {}
+        self._shared: Dict[int, Tuple[weakref.ref, str]] = {}
+        self._lock = threading.Lock()
+        # Volume copies happen here, never on the caller's (GUI) thread.
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="oct-share")
+        self._local: "queue.Queue" = queue.Queue()
+
+    def _share(self, arr) -> str:
+        # Each array is written to a memmap once and reused by later jobs.
+        backing = _npy_backing(arr)
+        if backing is not None:
+            return backing
+        entry = self._shared.get(id(arr))
+        if entry is not None and entry[0]() is arr:
+            return entry[1]
+        for key, (ref, stale) in list(self._shared.items()):
+            if ref() is None:
+                del self._shared[key]
+                _remove_file(stale)
+        path = _write_array(
+            np.ascontiguousarray(arr),
+            os.path.join(self.workdir, f"shared_{next(self._names)}.npy"),
+        )
+        self._shared[id(arr)] = (weakref.ref(arr), path)
+        return path
+
+    def _dispatch(self, handle: JobHandle, prepare: Callable[[], Dict[str, Any]]) -> None:
+        try:
+            job = prepare()
+        except Exception as e:
+            self._local.put((handle.id, "error", f"{type(e).__name__}: {e}"))
+            return
+        self._jobs.put(dict(job, id=handle.id, kind=handle.kind))
+
+    def _submit(
+        self, kind: str, prepare: Callable[[], Dict[str, Any]], inputs, on_progress, on_done
+    ) -> JobHandle:
+        handle = JobHandle(
+            id=next(self._ids),
+            kind=kind,
+            on_progress=on_progress,
+            on_done=on_done,
+            _inputs=tuple(inputs),
+        )
+        self._handles[handle.id] = handle
+        self._writer.submit(self._dispatch, handle, prepare)
+        return handle
+
+    def submit_dvc(
+        self,
+        pair: VolumePair,
+        roi: ROI,
+        params: DVCParameters,
+        initial_guess: Optional[AffineTransform] = None,
+        on_progress: Optional[Callable[[JobHandle], None]] = None,
+        on_done: Optional[Callable[[JobHandle], None]] = None,
+    ) -> JobHandle:
+        def prepare():
+            return {
+                "reference": self._share(pair.reference.data),
+                "reference_meta": pair.reference.meta,
+                "deformed": self._share(pair.deformed.data),
+                "deformed_meta": pair.deformed.meta,
+                "roi": roi,
+                "params": params,
+                "initial_guess": initial_guess if initial_guess is not None else pair.transform,
+            }
+
+        inputs = (pair.reference.data, pair.deformed.data)
+        return self._submit("dvc", prepare, inputs, on_progress, on_done)
+
+    def submit_surface(
+        self,
+        segmentation: Segmentation,
+        smoothing: int = 0,
+        on_progress: Optional[Callable[[JobHandle], None]] = None,
+        on_done: Optional[Callable[[JobHandle], None]] = None,
+    ) -> JobHandle:
+        def prepare():
+            return {
+                "labels": self._share(segmentation.labels),
+                "meta": segmentation.meta,
+                "smoothing": smoothing,
+            }
+
+        return self._submit(
+            "surface", prepare, (segmentation.labels,), on_progress, on_done
+        )
+
+    def _open_result(self, handle: JobHandle, path: str):
+        # Result files are deleted once the last array mapping them is collected.
+        arr = handle._arrays.get(path)
+        if arr is None:
+            arr = _open_array(path)
+            weakref.finalize(arr, _remove_file, path)
+            handle._arrays[path] = arr
+        return arr
+
+    def _materialize(self, handle: JobHandle, payload: Dict[str, Any]) -> Any:
+        if handle.kind == "dvc":
+            arrays = {
+                name: self._open_result(handle, p) for name, p in payload["paths"].items()
+            }
+            meta: VolumeMeta = payload["meta"]
+            return DVCResult(
+                displacement=DisplacementField(
+                    **{n: arrays[n] for n in _DISPLACEMENT_FIELDS}, meta=meta
+                ),
+                strain=StrainTensor(**{n: arrays[n] for n in _STRAIN_FIELDS}, meta=meta),
+            )
+        import pyvista as pv
+        from .labels import Label
+
+        meshes = {}
+        for value, paths in payload["meshes"].items():
+            if paths is None:
+                meshes[Label(value)] = None
+                continue
+            meshes[Label(value)] = pv.PolyData(np.load(paths[0]), np.load(paths[1]))
+            for path in paths:
+                _remove_file(path)
+        return meshes
+
+    def pending(self) -> int:
+        return len(self._handles)
+
+    def alive(self) -> bool:
+        return self._process.is_alive()
+
+    def _finish(self, handle: JobHandle) -> None:
+        self._handles.pop(handle.id, None)
+        handle._inputs = ()
+        if handle.error is not None:
+            # Drop whatever a failed job wrote that nobody has mapped.
+            for path in glob.glob(os.path.join(self.workdir, f"{handle.id}_*.npy")):
+                if path not in handle._arrays:
+                    _remove_file(path)
+        handle._arrays = {}
+        handle._done.set()
+
+    def _next_event(self, timeout: Optional[float]):
+        try:
+            return self._local.get_nowait()
+        except queue.Empty:
+            pass
+        if timeout:
+            return self._events.get(timeout=timeout)
+        return self._events.get_nowait()
+
+    def poll(self, timeout: Optional[float] = 0.0) -> int:
+        # Dispatches queued events; GUIs call this from a timer, scripts via JobHandle waits.
+        # Only draining holds the lock. Events are applied and their callbacks run one by
+        # one afterwards, so each callback sees its own event's state and may re-enter
+        # poll()/wait() or spin a nested event loop (e.g. a modal dialog) safely.
+        events = []
+        with self._lock:
+            # Sampled before draining so events flushed just before exit are still delivered.
+            dead = not self._process.is_alive()
+            while True:
+                try:
+                    events.append(self._next_event(timeout))
+                    timeout = 0.0
+                except queue.Empty:
+                    break
+        for job_id, kind, payload in events:
+            handle = self._handles.get(job_id)
+            if handle is None:
+                continue
+            if kind == "progress":
+                handle.progress = float(payload)
+            elif kind == "partial":
+                handle.partials = {
+                    n: self._open_result(handle, p) for n, p in payload["paths"].items()
+                }
+                handle.filled = int(payload["filled"])
+            elif kind == "done":
+                handle.progress = 1.0
+                handle.result = self._materialize(handle, payload)
+            elif kind == "error":
+                handle.error = payload
+            if kind in ("done", "error"):
+                self._finish(handle)
+                callback = handle.on_done
+            else:
+                callback = handle.on_progress
+            if callback is not None:
+                callback(handle)
+        handled = len(events)
+        if dead:
+            code = self._process.exitcode
+            for handle in list(self._handles.values()):
+                handle.error = f"compute process exited (code {code})"
+                self._finish(handle)
+                handled += 1
+                if handle.on_done is not None:
+                    handle.on_done(handle)
+        return handled
+
+    def wait(self, handle: JobHandle, timeout: Optional[float] = None) -> Any:
+        import time
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not handle.done():
+            remaining = 0.5 if deadline is None else min(0.5, deadline - time.monotonic())
+            if remaining <= 0:
+                raise TimeoutError(f"job {handle.id} did not finish")
+            self.poll(timeout=remaining)
+        if handle.error is not None:
+            raise RuntimeError(handle.error)
+        return handle.result
+
+    def shutdown(self) -> None:
+        self._writer.shutdown(wait=True, cancel_futures=True)
+        if self._process.is_alive():
+            self._jobs.put(None)
+            self._process.join(timeout=5)
+            if self._process.is_alive():
+                self._process.terminate()
+        self._shared.clear()
+        if self._owns_workdir:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
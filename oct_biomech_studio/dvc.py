@@ -1,27 +1,52 @@
 from dataclasses import dataclass
-from typing import Protocol
-from .models import Volume, DVCParameters, DVCResult
+from typing import Optional, Protocol
+from .models import AffineTransform, Volume, DVCParameters, DVCResult
 from .roi import ROI
 
 
 class DVCAlgorithm(Protocol):
     def compute(
-        self, reference: Volume, deformed: Volume, roi: ROI, params: DVCParameters
+        self,
+        reference: Volume,
+        deformed: Volume,
+        roi: ROI,
+        params: DVCParameters,
+        initial_guess: Optional[AffineTransform] = None,
     ) -> DVCResult: ...
 
 
+def _initial_displacement(reference: Volume, initial_guess: Optional[AffineTransform]):
+    import numpy as np
+
+    shape = reference.data.shape
+    if initial_guess is None:
+        return (
+            np.zeros(shape, dtype=np.float32),
+            np.zeros(shape, dtype=np.float32),
+            np.zeros(shape, dtype=np.float32),
+        )
+    from .registration import affine_displacement
+
+    return affine_displacement(initial_guess, shape, reference.meta.spacing)
+
+
 @dataclass
 class FFTBasedDVC:
-    def compute(self, reference: Volume, deformed: Volume, roi: ROI, params: DVCParameters) -> DVCResult:
+    def compute(
+        self,
+        reference: Volume,
+        deformed: Volume,
+        roi: ROI,
+        params: DVCParameters,
+        initial_guess: Optional[AffineTransform] = None,
+    ) -> DVCResult:
         import numpy as np
         from .models import DisplacementField, StrainTensor
         ref = reference.data
         if ref is None:
             raise ValueError("reference data is None")
         shape = ref.shape
-        u = np.zeros(shape, dtype=np.float32)
-        v = np.zeros(shape, dtype=np.float32)
-        w = np.zeros(shape, dtype=np.float32)
+        u, v, w = _initial_displacement(reference, initial_guess)
         disp = DisplacementField(u=u, v=v, w=w, meta=reference.meta)
         exx = eyy = ezz = exy = eyz = ezx = np.zeros(shape, dtype=np.float32)
         strain = StrainTensor(exx=exx, eyy=eyy, ezz=ezz, exy=exy, eyz=eyz, ezx=ezx, meta=reference.meta)
@@ -30,16 +55,21 @@ class FFTBasedDVC:
 
 @dataclass
 class NewtonRaphsonDVC:
-    def compute(self, reference: Volume, deformed: Volume, roi: ROI, params: DVCParameters) -> DVCResult:
+    def compute(
+        self,
+        reference: Volume,
+        deformed: Volume,
+        roi: ROI,
+        params: DVCParameters,
+        initial_guess: Optional[AffineTransform] = None,
+    ) -> DVCResult:
         import numpy as np
         from .models import DisplacementField, StrainTensor
         ref = reference.data
         if ref is None:
             raise ValueError("reference data is None")
         shape = ref.shape
-        u = np.zeros(shape, dtype=np.float32)
-        v = np.zeros(shape, dtype=np.float32)
-        w = np.zeros(shape, dtype=np.float32)
+        u, v, w = _initial_displacement(reference, initial_guess)
         disp = DisplacementField(u=u, v=v, w=w, meta=reference.meta)
         exx = eyy = ezz = exy = eyz = ezx = np.zeros(shape, dtype=np.float32)
         strain = StrainTensor(exx=exx, eyy=eyy, ezz=ezz, exy=exy, eyz=eyz, ezx=ezx, meta=reference.meta)
@@ -0,0 +1,237 @@
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from .dvc import DVCAlgorithm
+from .models import (
+    AffineTransform,
+    DisplacementField,
+    DVCParameters,
+    DVCResult,
+    StrainTensor,
+    Volume,
+    VolumePair,
+)
+from .roi import ROI
+
+
+SubsetKey = Tuple[int, int, int]
+
+_FIELDS = ("u", "v", "w", "exx", "eyy", "ezz", "exy", "eyz", "ezx")
+
+
+def subset_axes(shape, params: DVCParameters) -> List[np.ndarray]:
+    # Subset centres along each axis, keeping whole subsets inside the volume.
+    axes = []
+    for n, size, step in zip(shape, params.subset_size, params.step_size):
+        half = size // 2
+        centers = np.arange(half, n - half, max(1, step))
+        if centers.size == 0:
+            centers = np.array([n // 2])
+        axes.append(centers)
+    return axes
+
+
+def _cover_boxes(mask: np.ndarray) -> List[Tuple[Tuple[int, int, int], Tuple[int, int, int]]]:
+    # Greedy exact cover of a boolean grid by disjoint boxes, as (lo, hi) half-open keys.
+    remaining = mask.copy()
+    boxes = []
+    while remaining.any():
+        i, j, k = np.unravel_index(int(np.argmax(remaining)), remaining.shape)
+        k1 = k + 1
+        while k1 < remaining.shape[2] and remaining[i, j, k1]:
+            k1 += 1
+        j1 = j + 1
+        while j1 < remaining.shape[1] and remaining[i, j1, k:k1].all():
+            j1 += 1
+        i1 = i + 1
+        while i1 < remaining.shape[0] and remaining[i1, j:j1, k:k1].all():
+            i1 += 1
+        remaining[i:i1, j:j1, k:k1] = False
+        boxes.append(((int(i), int(j), int(k)), (int(i1), int(j1), int(k1))))
+    return boxes
+
+
+def crop_transform(
+    transform: Optional[AffineTransform], lo
+) -> Optional[AffineTransform]:
+    # Re-express q = A p + t in crop-local indices: t' = t + A lo - lo.
+    if transform is None:
+        return None
+    lo = np.asarray(lo, dtype=np.float64)
+    a = np.asarray(transform.matrix, dtype=np.float64).reshape(3, 3)
+    t = np.asarray(transform.translation, dtype=np.float64) + a @ lo - lo
+    return replace(transform, translation=(float(t[0]), float(t[1]), float(t[2])))
+
+
+def crop_volume(volume: Volume, lo, hi) -> Volume:
+    data = volume.data[tuple(slice(int(a), int(b)) for a, b in zip(lo, hi))]
+    meta = volume.meta
+    origin = tuple(float(o + s * i) for o, s, i in zip(meta.origin, meta.spacing, lo))
+    return Volume(
+        data=data,
+        meta=replace(meta, origin=origin, shape=tuple(int(n) for n in data.shape)),
+    )
+
+
+def crop_pair(pair: VolumePair, lo, hi) -> VolumePair:
+    return VolumePair(
+        reference=crop_volume(pair.reference, lo, hi),
+        deformed=crop_volume(pair.deformed, lo, hi),
+        transform=crop_transform(pair.transform, lo),
+    )
+
+
+@dataclass
+class SubsetBatch:
+    keys: List[SubsetKey]
+    centers: np.ndarray
+    offset: Tuple[int, int, int]
+    pair: VolumePair
+
+
+class SubsetResultStore:
+    def __init__(self):
+        self._values: Dict[SubsetKey, np.ndarray] = {}
+
+    def __contains__(self, key: SubsetKey) -> bool:
+        return key in self._values
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def get(self, key: SubsetKey) -> Optional[np.ndarray]:
+        return self._values.get(key)
+
+    def put(self, key: SubsetKey, values: np.ndarray) -> None:
+        self._values[key] = values
+
+    def clear(self) -> None:
+        self._values.clear()
+
+
+class IncrementalDVC:
+    def __init__(self, pair: VolumePair, params: DVCParameters, algorithm: DVCAlgorithm):
+        self.pair = pair
+        self.params = params
+        self.algorithm = algorithm
+        self.store = SubsetResultStore()
+        self.roi: Optional[ROI] = None
+        self.active: List[SubsetKey] = []
+        self._pending: Set[SubsetKey] = set()
+        meta = pair.reference.meta
+        self._axes = subset_axes(pair.reference.data.shape, params)
+        grid = np.stack(
+            np.meshgrid(*self._axes, indexing="ij"), axis=-1
+        ).reshape(-1, 3)
+        self._grid_keys = np.stack(
+            np.meshgrid(*(np.arange(a.size) for a in self._axes), indexing="ij"),
+            axis=-1,
+        ).reshape(-1, 3)
+        self._grid_centers = grid
+        self._grid_world = np.asarray(meta.origin) + grid * np.asarray(meta.spacing)
+
+    def plan(self, roi: ROI) -> List[SubsetBatch]:
+        # Diffs the ROI against the store: only subsets never computed become work,
+        # split into boxes so an L-shaped difference does not crop the whole ROI.
+        if roi == self.roi:
+            return []
+        self.roi = roi
+        inside = roi.contains_points(self._grid_world)
+        self.active = [tuple(int(i) for i in k) for k in self._grid_keys[inside]]
+        shape = tuple(int(a.size) for a in self._axes)
+        todo = np.zeros(shape, dtype=bool)
+        for key in self.active:
+            if key not in self.store and key not in self._pending:
+                todo[key] = True
+        return [self._batch(lo, hi) for lo, hi in _cover_boxes(todo)]
+
+    def _batch(self, key_lo, key_hi) -> SubsetBatch:
+        ranges = [np.arange(a, b) for a, b in zip(key_lo, key_hi)]
+        keys_arr = np.stack(np.meshgrid(*ranges, indexing="ij"), axis=-1).reshape(-1, 3)
+        keys = [tuple(int(i) for i in k) for k in keys_arr]
+        centers = np.stack(
+            [self._axes[d][keys_arr[:, d]] for d in range(3)], axis=1
+        )
+        shape = np.asarray(self.pair.reference.data.shape)
+        half = np.asarray(self.params.subset_size) // 2
+        lo = np.clip(centers.min(axis=0) - half, 0, shape - 1)
+        hi = np.clip(centers.max(axis=0) + half + 1, 1, shape)
+        self._pending.update(keys)
+        return SubsetBatch(
+            keys=keys,
+            centers=centers,
+            offset=(int(lo[0]), int(lo[1]), int(lo[2])),
+            pair=crop_pair(self.pair, lo, hi),
+        )
+
+    def integrate(self, batch: SubsetBatch, result: DVCResult) -> None:
+        local = batch.centers - np.asarray(batch.offset)
+        index = (local[:, 0], local[:, 1], local[:, 2])
+        sources = [getattr(result.displacement, n) for n in _FIELDS[:3]] + [
+            getattr(result.strain, n) for n in _FIELDS[3:]
+        ]
+        values = np.stack([np.asarray(src)[index] for src in sources], axis=1)
+        for key, row in zip(batch.keys, values):
+            self.store.put(key, row.astype(np.float32))
+        self._pending.difference_update(batch.keys)
+
+    def discard(self, batch: SubsetBatch) -> None:
+        self._pending.difference_update(batch.keys)
+
+    def compute(self, batch: SubsetBatch, roi: ROI) -> DVCResult:
+        return self.algorithm.compute(
+            batch.pair.reference,
+            batch.pair.deformed,
+            roi,
+            self.params,
+            initial_guess=batch.pair.transform,
+        )
+
+    def update(self, roi: ROI) -> DVCResult:
+        batches = self.plan(roi)
+        for i, batch in enumerate(batches):
+            try:
+                self.integrate(batch, self.compute(batch, roi))
+            except Exception:
+                for pending in batches[i:]:
+                    self.discard(pending)
+                raise
+        return self.result()
+
+    def result(self, keys: Optional[Iterable[SubsetKey]] = None) -> DVCResult:
+        # Results live on the subset grid; subsets outside the ROI are NaN.
+        meta = self.pair.reference.meta
+        shape = tuple(int(a.size) for a in self._axes)
+        fields = {n: np.full(shape, np.nan, dtype=np.float32) for n in _FIELDS}
+        for key in self.active if keys is None else keys:
+            values = self.store.get(key)
+            if values is None:
+                continue
+            for n, value in zip(_FIELDS, values):
+                fields[n][key] = value
+        first = np.asarray([a[0] for a in self._axes])
+        step = np.asarray(
+            [a[1] - a[0] if a.size > 1 else 1 for a in self._axes], dtype=np.float64
+        )
+        grid_meta = replace(
+            meta,
+            origin=tuple(
+                float(x) for x in np.asarray(meta.origin) + first * np.asarray(meta.spacing)
+            ),
+            spacing=tuple(float(x) for x in step * np.asarray(meta.spacing)),
+            shape=shape,
+        )
+        return DVCResult(
+            displacement=DisplacementField(
+                u=fields["u"], v=fields["v"], w=fields["w"], meta=grid_meta
+            ),
+            strain=StrainTensor(
+                exx=fields["exx"],
+                eyy=fields["eyy"],
+                ezz=fields["ezz"],
+                exy=fields["exy"],
+                eyz=fields["eyz"],
+                ezx=fields["ezx"],
+                meta=grid_meta,
+            ),
+        )
@@ -1,4 +1,5 @@
-from typing import Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
 from pathlib import Path
 from .models import VolumeMeta, Volume, Segmentation, VolumePair
 
@@ -19,6 +20,62 @@ def _default_meta(shape: Tuple[int, int, int], path: str) -> VolumeMeta:
     )
 
 
+def _shape3(shape) -> Tuple[int, int, int]:
+    return (int(shape[0]), int(shape[1]), int(shape[2]))
+
+
+def _sitk_meta(src, shape, path: str) -> VolumeMeta:
+    # src is a SimpleITK Image or an ImageFileReader after ReadImageInformation.
+    return VolumeMeta(
+        origin=src.GetOrigin(),
+        spacing=src.GetSpacing(),
+        direction=tuple(src.GetDirection()),
+        shape=_shape3(shape),
+        path=path,
+    )
+
+
+def _sitk_header_shape(reader) -> Tuple[int, int, int]:
+    size = reader.GetSize()
+    if len(size) != 3:
+        raise ValueError("volume must be 3D")
+    # GetArrayFromImage reverses the ITK size order.
+    return _shape3(tuple(reversed(size)))
+
+
+def _tiff_shape(n_pages: int, page_shape) -> Tuple[int, int, int]:
+    # 确保是3D数据: frames are stacked on axis 0 and trailing axes folded into the last.
+    if n_pages == 0:
+        raise ValueError("No image frames found in TIFF file")
+    shape = (n_pages,) + tuple(page_shape)
+    if len(shape) == 2:
+        shape = (1,) + shape
+    elif len(shape) > 3:
+        rest = 1
+        for d in shape[2:]:
+            rest *= d
+        shape = (shape[0], shape[1], rest)
+    return _shape3(shape)
+
+
+def _read_sitk(p: Path, kind: str):
+    try:
+        import SimpleITK as sitk
+    except Exception:
+        raise ImportError(f"SimpleITK is required to load {kind}")
+    img = sitk.ReadImage(str(p))
+    arr = sitk.GetArrayFromImage(img)
+    return arr, _sitk_meta(img, arr.shape, str(p))
+
+
+def _import_tifffile():
+    try:
+        import tifffile
+    except ImportError as e:
+        raise ImportError("tifffile is required to load TIFF: pip install tifffile") from e
+    return tifffile
+
+
 def load_volume(path: str) -> Volume:
     p = Path(path)
     ext = p.suffix.lower()
@@ -28,77 +85,23 @@ def load_volume(path: str) -> Volume:
         arr = np.load(str(p))
         if arr.ndim != 3:
             raise ValueError("volume must be 3D")
-        meta = _default_meta(
-            (int(arr.shape[0]), int(arr.shape[1]), int(arr.shape[2])), str(p)
-        )
-        return Volume(data=arr, meta=meta)
+        return Volume(data=arr, meta=_default_meta(_shape3(arr.shape), str(p)))
     if ext in (".nii", ".gz") or p.name.endswith(".nii.gz"):
-        try:
-            import SimpleITK as sitk
-            import numpy as np
-        except Exception:
-            raise ImportError("SimpleITK is required to load NIfTI")
-        img = sitk.ReadImage(str(p))
-        arr = sitk.GetArrayFromImage(img)
-        origin = img.GetOrigin()
-        spacing = img.GetSpacing()
-        direction = tuple(img.GetDirection())
-        shape = (int(arr.shape[0]), int(arr.shape[1]), int(arr.shape[2]))
-        meta = VolumeMeta(
-            origin=origin,
-            spacing=spacing,
-            direction=direction,
-            shape=shape,
-            path=str(p),
-        )
+        arr, meta = _read_sitk(p, "NIfTI")
         return Volume(data=arr, meta=meta)
     if ext in (".dcm",):
-        try:
-            import SimpleITK as sitk
-        except Exception:
-            raise ImportError("SimpleITK is required to load DICOM")
-        img = sitk.ReadImage(str(p))
-        arr = sitk.GetArrayFromImage(img)
-        origin = img.GetOrigin()
-        spacing = img.GetSpacing()
-        direction = tuple(img.GetDirection())
-        shape = (int(arr.shape[0]), int(arr.shape[1]), int(arr.shape[2]))
-        meta = VolumeMeta(
-            origin=origin,
-            spacing=spacing,
-            direction=direction,
-            shape=shape,
-            path=str(p),
-        )
+        arr, meta = _read_sitk(p, "DICOM")
         return Volume(data=arr, meta=meta)
     if ext in (".tif", ".tiff"):
-        try:
-            import tifffile
-            import numpy as np
-        except ImportError as e:
-            raise ImportError("tifffile is required to load TIFF: pip install tifffile") from e
-        
+        import numpy as np
+
+        tifffile = _import_tifffile()
         with tifffile.TiffFile(str(p)) as tif:
             # 获取所有帧
-            images = []
-            for page in tif.pages:
-                images.append(page.asarray())
-            
-            if not images:
-                raise ValueError("No image frames found in TIFF file")
-            
-            arr = np.stack(images, axis=0)
-            
-        # 确保是3D数据
-        if arr.ndim == 2:
-            arr = arr[np.newaxis, ...]
-        elif arr.ndim > 3:
-            arr = arr.reshape(arr.shape[0], arr.shape[1], -1)
-        
-        meta = _default_meta(
-            (int(arr.shape[0]), int(arr.shape[1]), int(arr.shape[2])), str(p)
-        )
-        return Volume(data=arr, meta=meta)
+            images = [page.asarray() for page in tif.pages]
+        shape = _tiff_shape(len(images), images[0].shape if images else ())
+        arr = np.stack(images, axis=0).reshape(shape)
+        return Volume(data=arr, meta=_default_meta(shape, str(p)))
     raise NotImplementedError("unsupported format")
 
 
@@ -111,33 +114,123 @@ def load_segmentation(path: str) -> Segmentation:
         arr = np.load(str(p))
         if arr.ndim != 3:
             raise ValueError("segmentation must be 3D")
-        meta = _default_meta(
-            (int(arr.shape[0]), int(arr.shape[1]), int(arr.shape[2])), str(p)
-        )
-        return Segmentation(labels=arr, meta=meta)
+        return Segmentation(labels=arr, meta=_default_meta(_shape3(arr.shape), str(p)))
     if ext in (".nii", ".gz") or p.name.endswith(".nii.gz"):
+        arr, meta = _read_sitk(p, "NIfTI")
+        return Segmentation(labels=arr, meta=meta)
+    raise NotImplementedError("unsupported format")
+
+
+def read_volume_meta(path: str) -> VolumeMeta:
+    p = Path(path)
+    ext = p.suffix.lower()
+    if ext == ".npy":
+        import numpy as np
+
+        arr = np.load(str(p), mmap_mode="r")
+        if arr.ndim != 3:
+            raise ValueError("volume must be 3D")
+        return _default_meta(_shape3(arr.shape), str(p))
+    if ext in (".nii", ".gz", ".dcm") or p.name.endswith(".nii.gz"):
         try:
             import SimpleITK as sitk
         except Exception:
-            raise ImportError("SimpleITK is required to load NIfTI")
-        img = sitk.ReadImage(str(p))
-        arr = sitk.GetArrayFromImage(img)
-        origin = img.GetOrigin()
-        spacing = img.GetSpacing()
-        direction = tuple(img.GetDirection())
-        shape = (int(arr.shape[0]), int(arr.shape[1]), int(arr.shape[2]))
-        meta = VolumeMeta(
-            origin=origin,
-            spacing=spacing,
-            direction=direction,
-            shape=shape,
-            path=str(p),
-        )
-        return Segmentation(labels=arr, meta=meta)
+            raise ImportError("SimpleITK is required to read image headers")
+        reader = sitk.ImageFileReader()
+        reader.SetFileName(str(p))
+        reader.ReadImageInformation()
+        return _sitk_meta(reader, _sitk_header_shape(reader), str(p))
+    if ext in (".tif", ".tiff"):
+        tifffile = _import_tifffile()
+        with tifffile.TiffFile(str(p)) as tif:
+            n = len(tif.pages)
+            page_shape = tuple(tif.pages[0].shape) if n else ()
+        return _default_meta(_tiff_shape(n, page_shape), str(p))
     raise NotImplementedError("unsupported format")
 
 
-def load_volume_pair(reference_path: str, deformed_path: str) -> VolumePair:
-    ref = load_volume(reference_path)
-    defo = load_volume(deformed_path)
+def check_pair_compatible(
+    reference: VolumeMeta, deformed: VolumeMeta, tol: float = 1e-6
+) -> None:
+    if tuple(reference.shape) != tuple(deformed.shape):
+        raise ValueError(
+            f"volume shapes differ: {tuple(reference.shape)} vs {tuple(deformed.shape)}"
+        )
+    for a, b in zip(reference.spacing, deformed.spacing):
+        if abs(float(a) - float(b)) > tol * max(abs(float(a)), abs(float(b)), 1.0):
+            raise ValueError(
+                f"volume spacings differ: {tuple(reference.spacing)} vs {tuple(deformed.spacing)}"
+            )
+
+
+def load_volume_pair(
+    reference_path: str, deformed_path: str, validate: bool = True
+) -> VolumePair:
+    # SimpleITK, tifffile and numpy release the GIL during reads, so two threads overlap the I/O.
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        if validate:
+            ref_meta, def_meta = pool.map(read_volume_meta, (reference_path, deformed_path))
+            check_pair_compatible(ref_meta, def_meta)
+        ref_future = pool.submit(load_volume, reference_path)
+        def_future = pool.submit(load_volume, deformed_path)
+        ref = ref_future.result()
+        defo = def_future.result()
     return VolumePair(reference=ref, deformed=defo)
+
+
+class StudyPrefetcher:
+    def __init__(
+        self,
+        studies: Sequence[Tuple[str, str]],
+        lookahead: int = 1,
+        validate: bool = True,
+    ):
+        self.studies: List[Tuple[str, str]] = list(studies)
+        self.lookahead = max(0, lookahead)
+        self.validate = validate
+        self._pool = ThreadPoolExecutor(max_workers=max(1, self.lookahead))
+        self._futures: Dict[int, Future] = {}
+
+    def __len__(self) -> int:
+        return len(self.studies)
+
+    def _schedule(self, index: int) -> Optional[Future]:
+        if not 0 <= index < len(self.studies):
+            return None
+        future = self._futures.get(index)
+        if future is None:
+            ref_path, def_path = self.studies[index]
+            future = self._pool.submit(load_volume_pair, ref_path, def_path, self.validate)
+            self._futures[index] = future
+        return future
+
+    def get(self, index: int) -> VolumePair:
+        future = self._schedule(index)
+        if future is None:
+            raise IndexError("study index out of range")
+        window = range(index, index + self.lookahead + 1)
+        # Keep only the current pair and the lookahead window in memory.
+        for stale in [i for i in self._futures if i not in window]:
+            self._futures.pop(stale).cancel()
+        for ahead in window[1:]:
+            self._schedule(ahead)
+        return future.result()
+
+    def scheduled(self) -> List[int]:
+        return sorted(self._futures)
+
+    def __iter__(self):
+        for index in range(len(self.studies)):
+            yield self.get(index)
+
+    def close(self) -> None:
+        for future in self._futures.values():
+            future.cancel()
+        self._futures.clear()
+        self._pool.shutdown(wait=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -21,10 +21,18 @@ class Volume:
     meta: VolumeMeta
 
 
+@dataclass(frozen=True)
+class AffineTransform:
+    # Maps reference voxel indices p to deformed voxel indices q = matrix @ p + translation.
+    matrix: Tuple[float, float, float, float, float, float, float, float, float]
+    translation: Vector3
+
+
 @dataclass
 class VolumePair:
     reference: Volume
     deformed: Volume
+    transform: Optional[AffineTransform] = None
 
 
 @dataclass
@@ -0,0 +1,255 @@
+from dataclasses import replace
+from typing import Literal, Optional, Tuple
+import numpy as np
+from .models import AffineTransform, Volume, VolumeMeta, VolumePair
+from .sampling import trilinear_sample
+
+
+RegistrationMode = Literal["translation", "rigid", "affine"]
+
+
+def identity_transform() -> AffineTransform:
+    return AffineTransform(
+        matrix=(1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0),
+        translation=(0.0, 0.0, 0.0),
+    )
+
+
+def _to_arrays(transform: AffineTransform) -> Tuple[np.ndarray, np.ndarray]:
+    a = np.asarray(transform.matrix, dtype=np.float64).reshape(3, 3)
+    t = np.asarray(transform.translation, dtype=np.float64)
+    return a, t
+
+
+def _from_arrays(a: np.ndarray, t: np.ndarray) -> AffineTransform:
+    return AffineTransform(
+        matrix=tuple(float(x) for x in a.ravel()),
+        translation=(float(t[0]), float(t[1]), float(t[2])),
+    )
+
+
+def transform_points(transform: AffineTransform, points) -> np.ndarray:
+    a, t = _to_arrays(transform)
+    pts = np.asarray(points, dtype=np.float64)
+    return pts @ a.T + t
+
+
+def downsample(arr: np.ndarray, factor: int) -> np.ndarray:
+    if factor <= 1:
+        return np.asarray(arr, dtype=np.float32)
+    nx, ny, nz = (s // factor for s in arr.shape[:3])
+    if min(nx, ny, nz) == 0:
+        raise ValueError("downsample factor larger than volume")
+    # One slab of `factor` slices at a time, so peak memory is a slab plus the output.
+    out = np.empty((nx, ny, nz), dtype=np.float32)
+    for i in range(nx):
+        slab = np.asarray(
+            arr[i * factor : (i + 1) * factor, : ny * factor, : nz * factor],
+            dtype=np.float32,
+        )
+        out[i] = slab.reshape(factor, ny, factor, nz, factor).mean(axis=(0, 2, 4))
+    return out
+
+
+def _normalize(arr: np.ndarray) -> np.ndarray:
+    arr = arr.astype(np.float32, copy=False)
+    std = float(arr.std())
+    return (arr - float(arr.mean())) / (std if std > 0 else 1.0)
+
+
+def _hann(shape) -> np.ndarray:
+    wx = np.hanning(shape[0]).astype(np.float32) if shape[0] > 2 else np.ones(shape[0], np.float32)
+    wy = np.hanning(shape[1]).astype(np.float32) if shape[1] > 2 else np.ones(shape[1], np.float32)
+    wz = np.hanning(shape[2]).astype(np.float32) if shape[2] > 2 else np.ones(shape[2], np.float32)
+    return wx[:, None, None] * wy[None, :, None] * wz[None, None, :]
+
+
+def phase_correlation(reference: np.ndarray, moving: np.ndarray) -> np.ndarray:
+    # Returns t such that moving(p + t) ~= reference(p), in voxels of the inputs.
+    if reference.shape != moving.shape:
+        raise ValueError("phase correlation requires equal shapes")
+    window = _hann(reference.shape)
+    f_ref = np.fft.rfftn(_normalize(reference) * window)
+    f_mov = np.fft.rfftn(_normalize(moving) * window)
+    cross = f_mov * np.conj(f_ref)
+    cross /= np.abs(cross) + 1e-12
+    corr = np.fft.irfftn(cross, s=reference.shape, axes=(0, 1, 2))
+    peak = np.array(np.unravel_index(int(np.argmax(corr)), corr.shape))
+    shift = peak.astype(np.float64)
+    # Sub-voxel refinement with a 1D parabola through the peak on each axis.
+    for axis, n in enumerate(corr.shape):
+        lo = peak.copy()
+        hi = peak.copy()
+        lo[axis] = (peak[axis] - 1) % n
+        hi[axis] = (peak[axis] + 1) % n
+        c0 = corr[tuple(peak)]
+        cl = corr[tuple(lo)]
+        ch = corr[tuple(hi)]
+        denom = cl - 2.0 * c0 + ch
+        if n > 2 and denom < 0:
+            shift[axis] += 0.5 * (cl - ch) / denom
+        if shift[axis] > n / 2:
+            shift[axis] -= n
+    return shift
+
+
+def _project_rigid(a: np.ndarray, spacing: np.ndarray) -> np.ndarray:
+    # Rigidity holds in physical space, so project S A S^-1 onto SO(3).
+    s = np.diag(spacing)
+    s_inv = np.diag(1.0 / spacing)
+    u, _, vt = np.linalg.svd(s @ a @ s_inv)
+    r = u @ vt
+    if np.linalg.det(r) < 0:
+        u[:, -1] = -u[:, -1]
+        r = u @ vt
+    return s_inv @ r @ s
+
+
+def refine_transform(
+    reference: np.ndarray,
+    moving: np.ndarray,
+    initial: AffineTransform,
+    mode: RegistrationMode = "rigid",
+    spacing=(1.0, 1.0, 1.0),
+    iterations: int = 20,
+    max_samples: int = 200_000,
+    tol: float = 1e-4,
+) -> AffineTransform:
+    # Minimizes the mean intensity SSD; both arrays share one voxel grid.
+    if mode == "translation":
+        return initial
+    ref = _normalize(reference)
+    mov = _normalize(moving)
+    grads = np.gradient(mov)
+    spacing_arr = np.asarray(spacing, dtype=np.float64)
+    rng = np.random.default_rng(0)
+    n = ref.size
+    idx = rng.choice(n, size=min(n, max_samples), replace=False) if n > max_samples else np.arange(n)
+    p = np.stack(np.unravel_index(idx, ref.shape), axis=1).astype(np.float64)
+    target = ref.ravel()[idx].astype(np.float64)
+    center = (np.asarray(ref.shape, dtype=np.float64) - 1.0) / 2.0
+    scale = float(max(ref.shape))
+    pc = (p - center) / scale
+
+    a, t = _to_arrays(initial)
+    # Parameterize q = A (p - c) + c + s so that rotations pivot about the centre.
+    s = t + a @ center - center
+
+    def evaluate(a, s):
+        q = (pc * scale) @ a.T + center + s
+        values = trilinear_sample(mov, q, fill=np.nan)
+        valid = ~np.isnan(values)
+        if valid.sum() < 12:
+            return q, values, valid, np.inf
+        return q, values, valid, float(np.mean((values[valid] - target[valid]) ** 2))
+
+    q, values, valid, cost = evaluate(a, s)
+    damping = 1e-3
+    for _ in range(iterations):
+        if not np.isfinite(cost):
+            break
+        g = np.stack([trilinear_sample(gd, q[valid]) for gd in grads], axis=1)
+        r = values[valid] - target[valid]
+        pv = pc[valid]
+        jac = np.concatenate(
+            [
+                g[:, 0:1] * pv,
+                g[:, 1:2] * pv,
+                g[:, 2:3] * pv,
+                g,
+            ],
+            axis=1,
+        )
+        h = jac.T @ jac
+        grad = jac.T @ r
+        # Levenberg-Marquardt: shrink the damping after a step lowers the SSD,
+        # grow it and retry from the same point after one that does not.
+        accepted = False
+        previous = cost
+        while damping < 1e8:
+            hd = h.copy()
+            hd[np.diag_indices_from(hd)] *= 1.0 + damping
+            delta = -np.linalg.solve(hd, grad)
+            a_new = a + delta[:9].reshape(3, 3) / scale
+            s_new = s + delta[9:]
+            if mode == "rigid":
+                a_new = _project_rigid(a_new, spacing_arr)
+            trial = evaluate(a_new, s_new)
+            if trial[3] < cost:
+                a, s = a_new, s_new
+                q, values, valid, cost = trial
+                damping = max(damping / 10.0, 1e-7)
+                accepted = True
+                break
+            damping *= 10.0
+        if not accepted or np.linalg.norm(delta) < tol or previous - cost < tol * previous:
+            break
+    return _from_arrays(a, s + center - a @ center)
+
+
+def estimate_transform(
+    reference: Volume,
+    deformed: Volume,
+    mode: RegistrationMode = "rigid",
+    factor: int = 4,
+    iterations: int = 20,
+) -> AffineTransform:
+    ref = downsample(reference.data, factor)
+    mov = downsample(deformed.data, factor)
+    if ref.shape != mov.shape:
+        raise ValueError("reference and deformed shapes differ")
+    shift = phase_correlation(ref, mov)
+    initial = _from_arrays(np.eye(3), shift)
+    spacing = np.asarray(reference.meta.spacing, dtype=np.float64) * factor
+    coarse = refine_transform(ref, mov, initial, mode=mode, spacing=spacing, iterations=iterations)
+    # Lift from the block-averaged grid: full index = factor * coarse index + offset.
+    a, t = _to_arrays(coarse)
+    offset = np.full(3, (factor - 1) / 2.0) if factor > 1 else np.zeros(3)
+    return _from_arrays(a, factor * t + (np.eye(3) - a) @ offset)
+
+
+def register_volume_pair(
+    pair: VolumePair,
+    mode: RegistrationMode = "rigid",
+    factor: int = 4,
+    iterations: int = 20,
+) -> VolumePair:
+    transform = estimate_transform(
+        pair.reference, pair.deformed, mode=mode, factor=factor, iterations=iterations
+    )
+    return replace(pair, transform=transform)
+
+
+def affine_displacement(
+    transform: AffineTransform, shape, spacing=(1.0, 1.0, 1.0)
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Dense (u, v, w) of the transform on the reference grid, in physical units.
+    a, t = _to_arrays(transform)
+    d = a - np.eye(3)
+    axes = np.ogrid[: shape[0], : shape[1], : shape[2]]
+    fields = []
+    for i in range(3):
+        comp = np.full(tuple(shape), t[i], dtype=np.float32)
+        for j in range(3):
+            if d[i, j] != 0.0:
+                comp += np.float32(d[i, j]) * axes[j].astype(np.float32)
+        fields.append(comp * np.float32(spacing[i]))
+    return fields[0], fields[1], fields[2]
+
+
+def resample_volume(
+    volume: Volume,
+    transform: AffineTransform,
+    meta: Optional[VolumeMeta] = None,
+) -> Volume:
+    # Pulls the deformed volume back onto the reference grid, one slice at a time.
+    meta = meta or volume.meta
+    nx, ny, nz = meta.shape
+    a, t = _to_arrays(transform)
+    yy, zz = np.meshgrid(np.arange(ny), np.arange(nz), indexing="ij")
+    plane = np.stack([np.zeros(yy.size), yy.ravel(), zz.ravel()], axis=1).astype(np.float64)
+    out = np.zeros((nx, ny, nz), dtype=np.float32)
+    for x in range(nx):
+        plane[:, 0] = x
+        out[x] = trilinear_sample(volume.data, plane @ a.T + t).reshape(ny, nz)
+    return Volume(data=out, meta=meta)
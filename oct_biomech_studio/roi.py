@@ -11,6 +11,12 @@ class ROI(ABC):
     @abstractmethod
     def contains(self, point: Vector3) -> bool: ...
 
+    def contains_points(self, points):
+        import numpy as np
+
+        pts = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        return np.array([self.contains(tuple(p)) for p in pts], dtype=bool)
+
 
 @dataclass(frozen=True)
 class BoxROI(ROI):
@@ -34,6 +40,13 @@ class BoxROI(ROI):
             and mn[2] <= point[2] <= mx[2]
         )
 
+    def contains_points(self, points):
+        import numpy as np
+
+        pts = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        mn, mx = self.bounds()
+        return np.all((pts >= mn) & (pts <= mx), axis=1)
+
 
 @dataclass(frozen=True)
 class SphereROI(ROI):
@@ -45,3 +58,10 @@ class SphereROI(ROI):
         dy = point[1] - self.center[1]
         dz = point[2] - self.center[2]
         return sqrt(dx * dx + dy * dy + dz * dz) <= self.radius
+
+    def contains_points(self, points):
+        import numpy as np
+
+        pts = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        d = pts - np.asarray(self.center, dtype=np.float64)
+        return np.sqrt(np.sum(d * d, axis=1)) <= self.radius
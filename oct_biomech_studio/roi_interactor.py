@@ -11,10 +11,15 @@ class ROIInteractor:
         self.sphere_widget = None
 
     def enable_box_roi(self):
-        self.plotter.enable_box_widget(callback=self._on_box_roi)
+        # Fire while dragging; callers are expected to debounce.
+        self.plotter.enable_box_widget(
+            callback=self._on_box_roi, interaction_event="always"
+        )
 
     def enable_sphere_roi(self):
-        self.plotter.enable_sphere_widget(callback=self._on_sphere_roi)
+        self.plotter.enable_sphere_widget(
+            callback=self._on_sphere_roi, interaction_event="always"
+        )
 
     def disable_all(self):
         if self.plotter.box_widget is not None:
@@ -0,0 +1,35 @@
+import numpy as np
+
+
+def trilinear_weights(shape, points):
+    # Eight (index, weight) corners per point plus an in-bounds mask; reusable across arrays.
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    shape = np.asarray(shape[:3])
+    valid = np.all((pts >= 0) & (pts <= shape - 1), axis=1)
+    i0 = np.clip(np.floor(pts).astype(np.intp), 0, np.maximum(shape - 2, 0))
+    f = np.clip(pts - i0, 0.0, 1.0)
+    corners = []
+    for dx in (0, 1):
+        wx = f[:, 0] if dx else 1.0 - f[:, 0]
+        ix = np.minimum(i0[:, 0] + dx, shape[0] - 1)
+        for dy in (0, 1):
+            wy = f[:, 1] if dy else 1.0 - f[:, 1]
+            iy = np.minimum(i0[:, 1] + dy, shape[1] - 1)
+            for dz in (0, 1):
+                wz = f[:, 2] if dz else 1.0 - f[:, 2]
+                iz = np.minimum(i0[:, 2] + dz, shape[2] - 1)
+                corners.append(((ix, iy, iz), wx * wy * wz))
+    return corners, valid
+
+
+def apply_trilinear_weights(arr, weights, fill: float = 0.0) -> np.ndarray:
+    corners, valid = weights
+    out = np.zeros(valid.shape[0], dtype=np.float64)
+    for index, w in corners:
+        out += w * arr[index]
+    out[~valid] = fill
+    return out
+
+
+def trilinear_sample(arr: np.ndarray, points, fill: float = 0.0) -> np.ndarray:
+    return apply_trilinear_weights(arr, trilinear_weights(arr.shape, points), fill)
@@ -1,28 +1,46 @@
+from typing import Dict, Optional
 import pyvista as pv
 import numpy as np
 from .labels import Label, LABEL_COLORS
+from .sampling import apply_trilinear_weights, trilinear_weights
+
+
+DISPLACEMENT_FIELDS = ("u", "v", "w")
+STRAIN_FIELDS = ("exx", "eyy", "ezz", "exy", "eyz", "ezx")
+
+# pyvista renamed UniformGrid to ImageData and later dropped the old name.
+_ImageData = getattr(pv, "ImageData", None) or pv.UniformGrid
 
 
 def _mesh_from_label(
-    labels: np.ndarray, label_value: int, origin, spacing, smoothing: int = 0
+    labels: np.ndarray,
+    label_value: int,
+    origin,
+    spacing,
+    smoothing: int = 0,
+    max_triangles: Optional[int] = None,
 ):
     mask = (labels == label_value).astype(np.uint8)
-    grid = pv.UniformGrid(dimensions=labels.shape, spacing=spacing, origin=origin)
+    grid = _ImageData(dimensions=labels.shape, spacing=spacing, origin=origin)
     grid.point_data["mask"] = mask.ravel(order="F")
     surf = grid.contour(isosurfaces=[0.5], method="marching_cubes")
+    if max_triangles is not None and surf.n_cells > max_triangles:
+        surf = surf.triangulate().decimate(1.0 - max_triangles / surf.n_cells)
     if smoothing > 0:
         surf = surf.smooth(n_iter=smoothing)
     return surf
 
 
-def build_surface_meshs(segmentation, smoothing: int = 0):
+def build_surface_meshs(
+    segmentation, smoothing: int = 0, max_triangles: Optional[int] = 100_000
+):
     labels = segmentation.labels
     meta = segmentation.meta
     meshes = {}
     for label in [Label.ILM, Label.OPL_Henles, Label.IS_OS, Label.IBRPE, Label.OBRPE]:
         try:
             mesh = _mesh_from_label(
-                labels, label.value, meta.origin, meta.spacing, smoothing
+                labels, label.value, meta.origin, meta.spacing, smoothing, max_triangles
             )
             meshes[label] = mesh
         except Exception:
@@ -30,14 +48,86 @@ def build_surface_meshs(segmentation, smoothing: int = 0):
     return meshes
 
 
-def add_surface_actors(plotter, meshes):
+def probe_points(points, meta):
+    # World coordinates -> voxel indices of the result grid, using the same axis convention as the grids above.
+    idx = (np.asarray(points, dtype=np.float64) - np.asarray(meta.origin)) / np.asarray(
+        meta.spacing
+    )
+    return trilinear_weights(meta.shape, idx)
+
+
+def sample_result(result, field: str, weights) -> np.ndarray:
+    if field == "displacement":
+        comps = [
+            apply_trilinear_weights(getattr(result.displacement, n), weights, np.nan)
+            for n in DISPLACEMENT_FIELDS
+        ]
+        return np.sqrt(sum(c * c for c in comps)).astype(np.float32)
+    source = result.displacement if field in DISPLACEMENT_FIELDS else result.strain
+    return apply_trilinear_weights(getattr(source, field), weights, np.nan).astype(
+        np.float32
+    )
+
+
+def update_surface_scalars(meshes, result, field: str = "ezz", probes=None) -> Dict:
+    # Writes into the existing point arrays so mapped actors only need a re-render.
+    probes = {} if probes is None else probes
+    meta = result.displacement.meta
+    key = (tuple(meta.origin), tuple(meta.spacing), tuple(meta.shape))
+    for label, mesh in meshes.items():
+        if mesh is None:
+            continue
+        cached = probes.get(label)
+        if cached is None or cached[0] != key:
+            cached = (key, probe_points(mesh.points, meta))
+            probes[label] = cached
+        values = sample_result(result, field, cached[1])
+        if field in mesh.point_data:
+            mesh.point_data[field][:] = values
+        else:
+            mesh.point_data[field] = values
+    return probes
+
+
+def scalar_range(meshes, field: str):
+    lo, hi = np.inf, -np.inf
+    for mesh in meshes.values():
+        if mesh is None or field not in mesh.point_data:
+            continue
+        values = np.asarray(mesh.point_data[field])
+        if np.isfinite(values).any():
+            lo = min(lo, float(np.nanmin(values)))
+            hi = max(hi, float(np.nanmax(values)))
+    if not np.isfinite(lo):
+        return (0.0, 1.0)
+    return (lo, hi) if hi > lo else (lo - 1e-6, hi + 1e-6)
+
+
+def add_surface_actors(plotter, meshes, scalars: Optional[str] = None):
     actors = {}
+    clim = scalar_range(meshes, scalars) if scalars is not None else None
     for label, mesh in meshes.items():
         if mesh is None:
             continue
         color = LABEL_COLORS[label]
-        actor = plotter.add_mesh(
-            mesh, color=color, opacity=0.9, name=f"surf_{label.name}"
-        )
+        if scalars is not None and scalars in mesh.point_data:
+            actor = plotter.add_mesh(
+                mesh,
+                scalars=scalars,
+                cmap="coolwarm",
+                clim=clim,
+                nan_color=color,
+                opacity=0.9,
+                name=f"surf_{label.name}",
+            )
+        else:
+            actor = plotter.add_mesh(
+                mesh, color=color, opacity=0.9, name=f"surf_{label.name}"
+            )
         actors[label] = actor
     return actors
+
+
+def set_surface_range(actors, clim) -> None:
+    for actor in actors.values():
+        actor.mapper.scalar_range = clim
@@ -0,0 +1,171 @@
+import unittest
+from oct_biomech_studio.compute import ComputeClient
+from oct_biomech_studio.models import VolumeMeta, Volume, VolumePair, DVCParameters
+from oct_biomech_studio.roi import BoxROI
+
+
+class TestCompute(unittest.TestCase):
+    def _volume(self):
+        import numpy as np
+
+        meta = VolumeMeta(
+            origin=(0.0, 0.0, 0.0),
+            spacing=(1.0, 1.0, 1.0),
+            direction=(1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0),
+            shape=(10, 10, 10),
+        )
+        return Volume(data=np.random.rand(10, 10, 10).astype(np.float32), meta=meta)
+
+    def test_dvc_job(self):
+        pair = VolumePair(reference=self._volume(), deformed=self._volume())
+        with ComputeClient() as client:
+            handle = client.submit_dvc(
+                pair,
+                BoxROI(center=(0, 0, 0), size=(2, 2, 2)),
+                DVCParameters(subset_size=(32, 32, 32), step_size=(8, 8, 8), algorithm="fft"),
+            )
+            result = client.wait(handle, timeout=60)
+            self.assertEqual(result.displacement.u.shape, (10, 10, 10))
+            self.assertIn("u", handle.partials)
+            self.assertEqual(handle.filled, 10)
+            self.assertEqual(handle.progress, 1.0)
+
+    def test_progress_streams_before_done(self):
+        import numpy as np
+        from oct_biomech_studio.models import AffineTransform
+
+        meta = VolumeMeta(
+            origin=(0.0, 0.0, 0.0),
+            spacing=(1.0, 1.0, 1.0),
+            direction=(1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0),
+            shape=(40, 8, 8),
+        )
+        vol = Volume(data=np.random.rand(40, 8, 8).astype(np.float32), meta=meta)
+        pair = VolumePair(
+            reference=vol,
+            deformed=vol,
+            transform=AffineTransform(
+                matrix=(1.01, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0),
+                translation=(0.5, 0.0, 0.0),
+            ),
+        )
+        seen = []
+        with ComputeClient() as client:
+            handle = client.submit_dvc(
+                pair,
+                BoxROI(center=(0, 0, 0), size=(2, 2, 2)),
+                DVCParameters(subset_size=(8, 8, 8), step_size=(4, 4, 4), algorithm="fft"),
+                on_progress=lambda h: seen.append((h.progress, h.filled)),
+            )
+            result = client.wait(handle, timeout=60)
+            progress = [p for p, _ in seen]
+            filled = [f for _, f in seen]
+            self.assertGreater(len(set(p for p in progress if p < 1.0)), 1)
+            self.assertEqual(filled, sorted(filled))
+            # Slab-wise output matches the dense seed from the transform.
+            x = np.arange(40, dtype=np.float32)[:, None, None]
+            expected = np.broadcast_to(0.01 * x + 0.5, (40, 8, 8))
+            np.testing.assert_allclose(np.asarray(result.displacement.u), expected, atol=1e-5)
+
+    def test_npy_memmap_not_copied(self):
+        import glob
+        import os
+        import tempfile
+        import numpy as np
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "vol.npy")
+            np.save(path, np.random.rand(10, 10, 10).astype(np.float32))
+            vol = self._volume()
+            vol.data = np.load(path, mmap_mode="r")
+            pair = VolumePair(reference=vol, deformed=vol)
+            with ComputeClient() as client:
+                handle = client.submit_dvc(
+                    pair,
+                    BoxROI(center=(0, 0, 0), size=(2, 2, 2)),
+                    DVCParameters(subset_size=(32, 32, 32), step_size=(8, 8, 8), algorithm="fft"),
+                )
+                client.wait(handle, timeout=60)
+                self.assertEqual(glob.glob(os.path.join(client.workdir, "shared_*")), [])
+
+    def test_result_files_released(self):
+        import gc
+        import glob
+        import os
+
+        pair = VolumePair(reference=self._volume(), deformed=self._volume())
+        with ComputeClient() as client:
+            handle = client.submit_dvc(
+                pair,
+                BoxROI(center=(0, 0, 0), size=(2, 2, 2)),
+                DVCParameters(subset_size=(32, 32, 32), step_size=(8, 8, 8), algorithm="fft"),
+            )
+            result = client.wait(handle, timeout=60)
+            pattern = os.path.join(client.workdir, f"{handle.id}_*.npy")
+            self.assertEqual(len(glob.glob(pattern)), 9)
+            del result, handle
+            gc.collect()
+            self.assertEqual(glob.glob(pattern), [])
+
+    def test_job_error(self):
+        pair = VolumePair(reference=self._volume(), deformed=self._volume())
+        with ComputeClient() as client:
+            handle = client.submit_dvc(
+                pair,
+                BoxROI(center=(0, 0, 0), size=(2, 2, 2)),
+                DVCParameters(subset_size=(32, 32, 32), step_size=(8, 8, 8), algorithm="bogus"),
+            )
+            with self.assertRaises(RuntimeError):
+                client.wait(handle, timeout=60)
+
+    def test_dead_worker_fails_jobs(self):
+        pair = VolumePair(reference=self._volume(), deformed=self._volume())
+        finished = []
+        with ComputeClient() as client:
+            client._process.kill()
+            client._process.join()
+            handle = client.submit_dvc(
+                pair,
+                BoxROI(center=(0, 0, 0), size=(2, 2, 2)),
+                DVCParameters(subset_size=(32, 32, 32), step_size=(8, 8, 8), algorithm="fft"),
+                on_done=finished.append,
+            )
+            client.poll()
+            self.assertFalse(client.alive())
+            self.assertEqual(client.pending(), 0)
+            self.assertEqual(finished, [handle])
+            self.assertIn("exited", handle.error)
+
+    def test_callback_reenters_poll(self):
+        pair = VolumePair(reference=self._volume(), deformed=self._volume())
+        reentered = []
+        with ComputeClient() as client:
+
+            def on_done(handle):
+                # Mirrors a modal dialog whose nested event loop fires the poll timer.
+                reentered.append(client._lock.acquire(timeout=2))
+                client._lock.release()
+                client.poll()
+
+            done = client.submit_dvc(
+                pair,
+                BoxROI(center=(0, 0, 0), size=(2, 2, 2)),
+                DVCParameters(subset_size=(32, 32, 32), step_size=(8, 8, 8), algorithm="fft"),
+                on_done=on_done,
+            )
+            client.wait(done, timeout=60)
+            client._process.kill()
+            client._process.join()
+            dead = client.submit_dvc(
+                pair,
+                BoxROI(center=(0, 0, 0), size=(2, 2, 2)),
+                DVCParameters(subset_size=(32, 32, 32), step_size=(8, 8, 8), algorithm="fft"),
+                on_done=on_done,
+            )
+            client.poll()
+            self.assertTrue(dead.done())
+        self.assertEqual(reentered, [True, True])
+
+
+if __name__ == "__main__":
+    unittest.main()
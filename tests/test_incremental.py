@@ -0,0 +1,74 @@
+import unittest
+from oct_biomech_studio.dvc import FFTBasedDVC
+from oct_biomech_studio.incremental import IncrementalDVC
+from oct_biomech_studio.models import VolumeMeta, Volume, VolumePair, DVCParameters
+from oct_biomech_studio.roi import BoxROI
+
+
+class CountingDVC(FFTBasedDVC):
+    def __init__(self):
+        self.calls = []
+
+    def compute(self, reference, deformed, roi, params, initial_guess=None):
+        self.calls.append(reference.data.shape)
+        return super().compute(reference, deformed, roi, params, initial_guess)
+
+
+class TestIncremental(unittest.TestCase):
+    def _pair(self, n=40):
+        import numpy as np
+
+        meta = VolumeMeta(
+            origin=(0.0, 0.0, 0.0),
+            spacing=(1.0, 1.0, 1.0),
+            direction=(1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0),
+            shape=(n, n, n),
+        )
+        data = np.random.rand(n, n, n).astype(np.float32)
+        return VolumePair(
+            reference=Volume(data=data, meta=meta), deformed=Volume(data=data, meta=meta)
+        )
+
+    def test_only_new_subsets_computed(self):
+        algo = CountingDVC()
+        params = DVCParameters(subset_size=(8, 8, 8), step_size=(4, 4, 4), algorithm="fft")
+        live = IncrementalDVC(self._pair(), params, algo)
+        live.update(BoxROI(center=(12, 20, 20), size=(8, 8, 8)))
+        first = len(live.store)
+        self.assertGreater(first, 0)
+        live.update(BoxROI(center=(12, 20, 20), size=(8, 8, 8)))
+        self.assertEqual(len(algo.calls), 1)
+        result = live.update(BoxROI(center=(16, 20, 20), size=(8, 8, 8)))
+        self.assertEqual(len(algo.calls), 2)
+        self.assertLess(len(live.store) - first, first)
+        self.assertEqual(result.displacement.u.shape, (8, 8, 8))
+
+    def test_diagonal_move_crops_only_new_slabs(self):
+        import numpy as np
+
+        algo = CountingDVC()
+        params = DVCParameters(subset_size=(8, 8, 8), step_size=(8, 8, 8), algorithm="fft")
+        live = IncrementalDVC(self._pair(96), params, algo)
+        live.update(BoxROI(center=(48, 48, 48), size=(40, 40, 40)))
+        full = int(np.prod(algo.calls[0]))
+        before = set(live.active)
+        algo.calls.clear()
+        live.update(BoxROI(center=(56, 56, 48), size=(40, 40, 40)))
+        new = set(live.active) - before
+        computed = sum(int(np.prod(shape)) for shape in algo.calls)
+        self.assertGreater(len(algo.calls), 1)
+        self.assertEqual(len(live.store), len(before) + len(new))
+        self.assertLess(computed, 0.5 * full)
+
+    def test_unchanged_roi_skips_compute(self):
+        algo = CountingDVC()
+        params = DVCParameters(subset_size=(8, 8, 8), step_size=(4, 4, 4), algorithm="fft")
+        live = IncrementalDVC(self._pair(), params, algo)
+        roi = BoxROI(center=(20, 20, 20), size=(10, 10, 10))
+        live.update(roi)
+        live.update(BoxROI(center=(20, 20, 20), size=(6, 6, 6)))
+        self.assertEqual(len(algo.calls), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
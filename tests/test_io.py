@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+from oct_biomech_studio.io import (
+    load_volume,
+    load_volume_pair,
+    read_volume_meta,
+    StudyPrefetcher,
+)
+
+
+class TestIO(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _save(self, name, shape):
+        import numpy as np
+
+        path = os.path.join(self.tmp.name, name)
+        np.save(path, np.random.rand(*shape).astype(np.float32))
+        return path
+
+    def test_read_meta_npy(self):
+        path = self._save("a.npy", (4, 5, 6))
+        self.assertEqual(read_volume_meta(path).shape, (4, 5, 6))
+
+    def test_pair_shape_mismatch(self):
+        ref = self._save("ref.npy", (4, 4, 4))
+        defo = self._save("def.npy", (4, 4, 5))
+        with self.assertRaises(ValueError):
+            load_volume_pair(ref, defo)
+
+    def test_prefetcher(self):
+        studies = [
+            (self._save(f"r{i}.npy", (3, 3, 3)), self._save(f"d{i}.npy", (3, 3, 3)))
+            for i in range(3)
+        ]
+        with StudyPrefetcher(studies, lookahead=1) as prefetcher:
+            pairs = list(prefetcher)
+        self.assertEqual(len(pairs), 3)
+        self.assertEqual(pairs[2].deformed.meta.path, studies[2][1])
+
+    def test_prefetcher_window(self):
+        studies = [
+            (self._save(f"r{i}.npy", (3, 3, 3)), self._save(f"d{i}.npy", (3, 3, 3)))
+            for i in range(4)
+        ]
+        with StudyPrefetcher(studies, lookahead=1) as prefetcher:
+            prefetcher.get(0)
+            self.assertEqual(prefetcher.scheduled(), [0, 1])
+            prefetcher.get(2)
+            self.assertEqual(prefetcher.scheduled(), [2, 3])
+            prefetcher.get(3)
+            self.assertEqual(prefetcher.scheduled(), [3])
+
+    def test_tiff_meta_matches_load(self):
+        try:
+            import tifffile
+        except ImportError:
+            self.skipTest("tifffile not installed")
+        import numpy as np
+
+        path = os.path.join(self.tmp.name, "a.tif")
+        tifffile.imwrite(
+            path, np.random.rand(4, 5, 6).astype(np.float32), photometric="minisblack"
+        )
+        self.assertEqual(read_volume_meta(path).shape, load_volume(path).meta.shape)
+
+
+if __name__ == "__main__":
+    unittest.main()
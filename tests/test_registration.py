@@ -0,0 +1,115 @@
+import unittest
+from oct_biomech_studio.models import AffineTransform, VolumeMeta, Volume, VolumePair
+from oct_biomech_studio.registration import (
+    downsample,
+    estimate_transform,
+    identity_transform,
+    phase_correlation,
+    register_volume_pair,
+    resample_volume,
+    transform_points,
+)
+
+
+class TestRegistration(unittest.TestCase):
+    def _volume(self, data):
+        meta = VolumeMeta(
+            origin=(0.0, 0.0, 0.0),
+            spacing=(1.0, 1.0, 1.0),
+            direction=(1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0),
+            shape=data.shape,
+        )
+        return Volume(data=data, meta=meta)
+
+    def _blobs(self):
+        import numpy as np
+
+        rng = np.random.default_rng(1)
+        x, y, z = np.meshgrid(
+            np.arange(48), np.arange(48), np.arange(48), indexing="ij"
+        )
+        arr = np.zeros((48, 48, 48), dtype=np.float32)
+        for cx, cy, cz in rng.uniform(12, 36, size=(6, 3)):
+            arr += np.exp(-((x - cx) ** 2 + (y - cy) ** 2 + (z - cz) ** 2) / 18.0)
+        return arr
+
+    def test_phase_correlation_shift(self):
+        import numpy as np
+
+        ref = self._blobs()
+        mov = np.roll(ref, (3, -2, 5), axis=(0, 1, 2))
+        shift = phase_correlation(ref, mov)
+        np.testing.assert_allclose(shift, (3, -2, 5), atol=0.5)
+
+    def test_register_pair_translation(self):
+        import numpy as np
+
+        ref = self._blobs()
+        mov = np.roll(ref, (4, 0, -4), axis=(0, 1, 2))
+        pair = VolumePair(reference=self._volume(ref), deformed=self._volume(mov))
+        registered = register_volume_pair(pair, mode="rigid", factor=2)
+        self.assertIsNone(pair.transform)
+        self.assertIsNotNone(registered.transform)
+        q = transform_points(registered.transform, [[24.0, 24.0, 24.0]])
+        np.testing.assert_allclose(q[0], (28.0, 24.0, 20.0), atol=0.75)
+
+    def _warped(self, matrix, translation):
+        # Builds a deformed volume with D(A p + t) = R(p) by pulling R through the inverse map.
+        import numpy as np
+
+        ref = self._volume(self._blobs())
+        a = np.asarray(matrix, dtype=np.float64).reshape(3, 3)
+        center = np.full(3, 23.5)
+        t = np.asarray(translation) + center - a @ center
+        a_inv = np.linalg.inv(a)
+        inverse = AffineTransform(
+            matrix=tuple(a_inv.ravel()), translation=tuple(-a_inv @ t)
+        )
+        truth = AffineTransform(matrix=tuple(a.ravel()), translation=tuple(t))
+        return ref, resample_volume(ref, inverse), truth
+
+    def _assert_recovers(self, mode, matrix, translation, atol):
+        import numpy as np
+
+        ref, mov, truth = self._warped(matrix, translation)
+        est = estimate_transform(ref, mov, mode=mode, factor=1, iterations=50)
+        probe = [[16.0, 16.0, 16.0], [24.0, 30.0, 20.0], [30.0, 18.0, 28.0]]
+        np.testing.assert_allclose(
+            transform_points(est, probe), transform_points(truth, probe), atol=atol
+        )
+
+    def test_rigid_rotation(self):
+        import numpy as np
+
+        th = np.deg2rad(4.0)
+        c, s = np.cos(th), np.sin(th)
+        self._assert_recovers(
+            "rigid", (c, -s, 0.0, s, c, 0.0, 0.0, 0.0, 1.0), (2.0, -1.0, 1.5), 0.1
+        )
+
+    def test_affine(self):
+        self._assert_recovers(
+            "affine", (1.03, 0.02, 0.0, 0.0, 0.98, 0.0, 0.0, 0.01, 1.0), (1.0, 0.5, -1.0), 0.1
+        )
+
+    def test_downsample_block_mean(self):
+        import numpy as np
+
+        arr = np.random.randint(0, 255, size=(9, 8, 10)).astype(np.uint8)
+        expected = (
+            arr[:8, :8, :10].astype(np.float64).reshape(4, 2, 4, 2, 5, 2).mean(axis=(1, 3, 5))
+        )
+        out = downsample(arr, 2)
+        self.assertEqual(out.dtype, np.float32)
+        np.testing.assert_allclose(out, expected, rtol=1e-6)
+
+    def test_resample_identity(self):
+        import numpy as np
+
+        vol = self._volume(self._blobs())
+        out = resample_volume(vol, identity_transform())
+        np.testing.assert_allclose(out.data, vol.data, atol=1e-5)
+
+
+if __name__ == "__main__":
+    unittest.main()
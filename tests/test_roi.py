@@ -13,6 +13,13 @@ class TestROI(unittest.TestCase):
         self.assertTrue(roi.contains((0.5, 0.5, 0.5)))
         self.assertFalse(roi.contains((1.0, 1.0, 1.0)))
 
+    def test_contains_points(self):
+        pts = [(0.5, 0.5, 0.5), (2.0, 0.0, 0.0)]
+        box = BoxROI(center=(0.0, 0.0, 0.0), size=(2.0, 2.0, 2.0))
+        sphere = SphereROI(center=(0.0, 0.0, 0.0), radius=1.0)
+        self.assertEqual(list(box.contains_points(pts)), [True, False])
+        self.assertEqual(list(sphere.contains_points(pts)), [True, False])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,30 @@
+import unittest
+from oct_biomech_studio.sampling import (
+    apply_trilinear_weights,
+    trilinear_sample,
+    trilinear_weights,
+)
+
+
+class TestSampling(unittest.TestCase):
+    def test_trilinear_weights_shared(self):
+        import numpy as np
+
+        x, y, z = np.meshgrid(np.arange(4), np.arange(5), np.arange(6), indexing="ij")
+        weights = trilinear_weights((4, 5, 6), [[1.5, 2.25, 3.0], [9.0, 0.0, 0.0]])
+        ax = apply_trilinear_weights(x.astype(np.float32), weights, np.nan)
+        ay = apply_trilinear_weights(y.astype(np.float32), weights, np.nan)
+        self.assertAlmostEqual(ax[0], 1.5)
+        self.assertAlmostEqual(ay[0], 2.25)
+        self.assertTrue(np.isnan(ax[1]))
+
+    def test_trilinear_sample_grid_points(self):
+        import numpy as np
+
+        arr = np.random.rand(3, 4, 5)
+        values = trilinear_sample(arr, [[0, 0, 0], [2, 3, 4], [1, 2, 3]])
+        np.testing.assert_allclose(values, [arr[0, 0, 0], arr[2, 3, 4], arr[1, 2, 3]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+
+try:
+    import pyvista as pv
+except ImportError:
+    pv = None
+
+from oct_biomech_studio.labels import Label
+from oct_biomech_studio.models import (
+    VolumeMeta,
+    Segmentation,
+    DisplacementField,
+    StrainTensor,
+    DVCResult,
+)
+
+
+@unittest.skipIf(pv is None, "pyvista not installed")
+class TestSurface(unittest.TestCase):
+    def _meta(self, shape=(10, 10, 10), origin=(0.0, 0.0, 0.0), spacing=(1.0, 1.0, 1.0)):
+        return VolumeMeta(
+            origin=origin,
+            spacing=spacing,
+            direction=(1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0),
+            shape=shape,
+        )
+
+    def _result(self, scale=1.0):
+        import numpy as np
+
+        meta = self._meta(origin=(0.0, 0.0, 0.0), spacing=(2.0, 2.0, 2.0))
+        x = np.broadcast_to(np.arange(10, dtype=np.float32)[:, None, None], (10, 10, 10))
+        ezz = (scale * x).astype(np.float32)
+        zero = np.zeros((10, 10, 10), dtype=np.float32)
+        return DVCResult(
+            displacement=DisplacementField(u=ezz, v=zero, w=zero, meta=meta),
+            strain=StrainTensor(
+                exx=zero, eyy=zero, ezz=ezz, exy=zero, eyz=zero, ezx=zero, meta=meta
+            ),
+        )
+
+    def _meshes(self):
+        points = [[2.0, 1.0, 1.0], [5.0, 3.0, 3.0], [9.0, 9.0, 9.0], [40.0, 0.0, 0.0]]
+        return {Label.ILM: pv.PolyData(points), Label.IS_OS: None}
+
+    def test_triangle_budget(self):
+        import numpy as np
+        from oct_biomech_studio.surface import build_surface_meshs
+
+        labels = np.zeros((40, 40, 40), dtype=np.uint8)
+        labels[5:35, 5:35, 10:20] = Label.ILM
+        meshes = build_surface_meshs(
+            Segmentation(labels=labels, meta=self._meta((40, 40, 40))), max_triangles=500
+        )
+        self.assertGreater(meshes[Label.ILM].n_cells, 0)
+        self.assertLessEqual(meshes[Label.ILM].n_cells, 500)
+
+    def test_probe_reused_and_updated_in_place(self):
+        import numpy as np
+        from oct_biomech_studio.surface import update_surface_scalars
+
+        meshes = self._meshes()
+        probes = update_surface_scalars(meshes, self._result(), "ezz")
+        first_probe = probes[Label.ILM]
+        first_array = meshes[Label.ILM].point_data["ezz"]
+        np.testing.assert_allclose(first_array[:3], [1.0, 2.5, 4.5])
+
+        probes = update_surface_scalars(meshes, self._result(2.0), "ezz", probes)
+        self.assertIs(probes[Label.ILM], first_probe)
+        second_array = meshes[Label.ILM].point_data["ezz"]
+        self.assertTrue(np.shares_memory(first_array, second_array))
+        np.testing.assert_allclose(second_array[:3], [2.0, 5.0, 9.0])
+
+    def test_points_outside_grid_are_nan(self):
+        import numpy as np
+        from oct_biomech_studio.surface import probe_points, sample_result
+
+        result = self._result()
+        weights = probe_points([[40.0, 0.0, 0.0], [-1.0, 0.0, 0.0]], result.strain.meta)
+        self.assertTrue(np.isnan(sample_result(result, "ezz", weights)).all())
+        self.assertTrue(np.isnan(sample_result(result, "displacement", weights)).all())
+
+    def test_scalar_range(self):
+        from oct_biomech_studio.surface import scalar_range, update_surface_scalars
+
+        meshes = self._meshes()
+        self.assertEqual(scalar_range(meshes, "ezz"), (0.0, 1.0))
+        update_surface_scalars(meshes, self._result(), "ezz")
+        self.assertEqual(scalar_range(meshes, "ezz"), (1.0, 4.5))
+
+
+if __name__ == "__main__":
+    unittest.main()